@@ -1,146 +1,119 @@
 import os
-memoryAddress = 5000
-rRegister = 0
-vars = dict()
-def getInstructionLine(varName):
-    global memoryAddress, rRegister
-    rRegisterName = f"%r{rRegister}"
-    setVariableRegister(varName, rRegisterName)
-    returnText = f"    ldim 0,{rRegisterName} \n    cmbi {rRegisterName},{memoryAddress}, {rRegisterName} "
-    rRegister += 1
-    memoryAddress += 4
-    return returnText
-
-def setVariableRegister(varName, rRegister):
-    global vars
-    vars[varName] = rRegister
-
-def getVariableRegister(varName):
-    global vars
-    if varName in vars:
-        return vars[varName]
-    else:
-        return "ERROR"
-
-def getAssignmentLinesImmediateValue(val, varName):
-    global rRegister
-    outputText = f"""    ldim {val},%r{rRegister}\n    srwd %r{rRegister}, 0({getVariableRegister(varName)})"""
-    rRegister += 1
-    return outputText
-
-
-def getAssignmentLinesVariable(varSource, varDest):
-    global rRegister
-    outputText = ""
-    registerSource = getVariableRegister(varSource)
-    outputText += f"    ldwd 0({registerSource}), %r{rRegister}" + "\n"
-
-    rRegister += 1
-
-    registerDest = getVariableRegister(varDest)
-
-    outputText += f"    srwd %r{rRegister-1}, 0({registerDest})"
-    # rRegister += 1
-    return outputText
-
-def evaluatingCondition(line, methods, indent):
-    global vars
-    indentSpace = ""
-    for i in range(indent*4):
-        indentSpace+=" "
-    output = ""
-    if("%" in line):
-        _, numbers = line.split("%")
-        num1,num2 = numbers.split(" == ")
-        num2 = num2[0]
-        output+=f"{indentSpace}cmbi %r{rRegister},{num1}, %r{rRegister}\n"
-        rRegister1 = rRegister+1
-        rRegister2 = rRegister+2
-        output+=f"{indentSpace}mdlo %r{vars['iteration']},%r{rRegister}, %r{rRegister1}\n"
-        
-        output+=f"{indentSpace}ldim {num2},%r{rRegister2}\n"
-        for method in methods:
-            output+=f"{indentSpace}ife %r{rRegister1},%r{rRegister2},{method}\n"
-        
-    return output
-def determineIterations(line):
-    arr = []
-    words = line.split(" ")
-    # print(words)
-    for word in words:
-        # print(word)
-        if word.strip(";").isnumeric():
-            
-            arr.append((int)(word.strip(";")))
-
-    if arr[0] < arr[1]:
-        return(arr[1]-arr[0])
-    else:
-        return(arr[0]-arr[1])
-
-f = open("/mnt/c/code/CS 240/240FinalProject/Compiler/program8.c", "r")
-
-lines = f.readlines()
-
-outputText = ""
-outputText += "data: \n"
-for line in lines:
-    if "\"" in line and not("%d" in line):
-        _,string,_ = line.split("\"")
+import re
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+# %-templates for the instructions emitted once per statement; they are built
+# once here instead of re-evaluating an f-string for every line of output.
+_T_DECL = "    ldim 0,%s \n    cmbi %s,%d, %s "
+_T_ASSIGN_IMM = "    ldim %s,%%r%d\n    srwd %%r%d, 0(%s)"
+_T_ASSIGN_VAR = "    ldwd 0(%s), %%r%d\n    srwd %%r%d, 0(%s)"
+_T_PRINT = "    %s:\n        ldad %s, %%r%d\n        pstr  0(%%r%d)\n        jmp Loop"
+_T_COND_IFE = "%sife %%r%d,%%r%d,%s"
+
+@dataclass(slots=True)
+class CodegenContext:
+    """Code generation state: next free memory address, next free register and the variable table."""
+    memoryAddress: int = 5000
+    rRegister: int = 0
+    vars: dict = field(default_factory=dict)
+
+    def getInstructionLine(self, varName):
+        rRegisterName = f"%r{self.rRegister}"
+        self.setVariableRegister(varName, rRegisterName)
+        returnText = _T_DECL % (rRegisterName, rRegisterName, self.memoryAddress, rRegisterName)
+        self.rRegister += 1
+        self.memoryAddress += 4
+        return returnText
+
+    def setVariableRegister(self, varName, rRegister):
+        self.vars[varName] = rRegister
+
+    def getVariableRegister(self, varName):
+        if varName in self.vars:
+            return self.vars[varName]
+        else:
+            return "ERROR"
+
+    def getAssignmentLinesImmediateValue(self, val, varName):
+        rRegister = self.rRegister
+        outputText = _T_ASSIGN_IMM % (val, rRegister, rRegister, self.getVariableRegister(varName))
+        self.rRegister += 1
+        return outputText
+
+    def getAssignmentLinesVariable(self, varSource, varDest):
+        rRegister = self.rRegister
+        registerSource = self.getVariableRegister(varSource)
+        registerDest = self.getVariableRegister(varDest)
+        self.rRegister += 1
+        return _T_ASSIGN_VAR % (registerSource, rRegister, rRegister, registerDest)
+
+    # The handle* methods and evaluatingCondition return the output lines they
+    # generate, without trailing newlines; the caller joins everything once.
+
+    def evaluatingCondition(self, line, methods, indent):
+        rRegister = self.rRegister
+        vars = self.vars
+        indentSpace = " " * (indent * 4)
+        parts = []
+        if("%" in line):
+            _, numbers = line.split("%")
+            num1,num2 = numbers.split(" == ")
+            num2 = num2[0]
+            parts.append(f"{indentSpace}cmbi %r{rRegister},{num1}, %r{rRegister}")
+            rRegister1 = rRegister+1
+            rRegister2 = rRegister+2
+            parts.append(f"{indentSpace}mdlo %r{vars['iteration']},%r{rRegister}, %r{rRegister1}")
+
+            parts.append(f"{indentSpace}ldim {num2},%r{rRegister2}")
+            for method in methods:
+                parts.append(_T_COND_IFE % (indentSpace, rRegister1, rRegister2, method))
+
+        return parts
+
+    def handleString(self, match):
+        string = match.group(1)
         name = string.strip("n").strip("\\")
-        vars[name] = string
-        outputText += f"    {name}: \"{string}\"\n"
-
-    
-    
-outputText += "instructions: \n"
-for line in lines:
-    if ("int" in line)  and ("main()" not in line) and ("for" not in line) and ("print" not in line):
-        print(line)
+        self.vars[name] = string
+        return [f"    {name}: \"{string}\""]
+
+    def handleDecl(self, match):
+        print(match.string)
         print("here")
-        _, var = line.split()
-        var = var.strip(";")
-        outputText += getInstructionLine(var) + "\n"
-    # assignments   
-    elif " = " in line and ("for" not in line):
-        varName, _, val = line.split()
-        val = val.strip(";")
+        return [self.getInstructionLine(match.group(1))]
+
+    def handleAssign(self, match):
+        varName, val = match.groups()
         if val.isdigit():
             # immediately value assignments
-            outputText += getAssignmentLinesImmediateValue(val, varName) + "\n"
-        else:
-            # variable assignments
-            outputText += getAssignmentLinesVariable(val, varName) + "\n"
-for line in lines:
-    if "printf(\"" in line:
-        
-        if "%d" in line:
-            break
-
-        _,name= line.split("printf(\"")
-        methodName = name.replace("\\n\");\n","")
-        outputText += f"    {methodName}:\n"
-        outputText += f"        ldad {methodName}, %r{rRegister}\n"
-        outputText += f"        pstr  0(%r{rRegister})\n"
-        outputText += f"        jmp Loop\n"
-for i  in range( len(lines)):
-    if "for" in lines[i]:
-        rRegister+=1
-        outputText += f"    cmbi %r{rRegister},1, %r{rRegister}\n"
-        vars["iteration"] = rRegister
-        rRegister+=1
-        numIterations = determineIterations(lines[i])
-        outputText += f"    cmbi %r{rRegister},{numIterations}, %r{rRegister}\n"
-        vars["end"] = rRegister
-        rRegister+=1
-        outputText += f"    cmbi %r{rRegister},1, %r{rRegister}\n"
-        outputText += f"    for  %r{rRegister},Loop\n"
-        outputText += f"    Loop:\n"
-        
-        
-        outputText += f"        cmbi %r{vars['iteration']},1,%r{vars['iteration']}\n"
-        outputText += f"        ife %r{vars['iteration']},%r{vars['end']},End\n"
-    if "if" in lines[i]:
+            return [self.getAssignmentLinesImmediateValue(val, varName)]
+        # variable assignments
+        return [self.getAssignmentLinesVariable(val, varName)]
+
+    def handlePrint(self, match):
+        rRegister = self.rRegister
+        methodName = match.group(1).removesuffix("\\n")
+        return [_T_PRINT % (methodName, methodName, rRegister, rRegister)]
+
+    def handleFor(self, match):
+        vars = self.vars
+        out = []
+        self.rRegister+=1
+        out.append(f"    cmbi %r{self.rRegister},1, %r{self.rRegister}")
+        vars["iteration"] = self.rRegister
+        self.rRegister+=1
+        numIterations = determineIterations(match.string)
+        out.append(f"    cmbi %r{self.rRegister},{numIterations}, %r{self.rRegister}")
+        vars["end"] = self.rRegister
+        self.rRegister+=1
+        out.append(f"    cmbi %r{self.rRegister},1, %r{self.rRegister}")
+        out.append(f"    for  %r{self.rRegister},Loop")
+        out.append(f"    Loop:")
+        out.append(f"        cmbi %r{vars['iteration']},1,%r{vars['iteration']}")
+        out.append(f"        ife %r{vars['iteration']},%r{vars['end']},End")
+        return out
+
+    def handleIf(self, lines, i):
         j= i
         methods = []
         while ("}" not in lines[j]):
@@ -150,19 +123,88 @@ for i  in range( len(lines)):
                 met,_ = strg.split("\\")
                 methods.append(met)
 
-        outputText+=evaluatingCondition(lines[i],methods,2)
-    if "else {" in lines[i]:
+        return self.evaluatingCondition(lines[i],methods,2)
+
+    def handleElse(self, lines, i):
+        out = []
         j = i+1
         while ("}" not in lines[j]):
             if ("printf" in lines[j]) and ("i" in lines[j]):
-               outputText+= f"        pint %r{vars['iteration']}\n"
+               out.append(f"        pint %r{self.vars['iteration']}")
             j+=1
-    if(i == len(lines)-1):
-        outputText += "    End:\n"
-        outputText += "        end\n"
-                
+        return out
 
+def determineIterations(line):
+    arr = []
+    for word in line.split(" "):
+        try:
+            arr.append(int(word.strip(";")))
+        except ValueError:
+            pass
+
+    return abs(arr[1] - arr[0])
+
+# Line kinds recognised in the C source, tried in order; a line takes the
+# first kind whose pattern matches it.
+LINE_KINDS = [
+    ("for",    re.compile(r'\bfor\s*\(')),
+    ("if",     re.compile(r'\bif\s*\(')),
+    ("else",   re.compile(r'\belse\s*\{')),
+    ("print",  re.compile(r'printf\("([^"]*)"')),
+    ("string", re.compile(r'"([^"]*)"')),
+    ("decl",   re.compile(r'^\s*int\s+(\w+)\s*;')),
+    ("assign", re.compile(r'^\s*(\w+)\s*=\s*(\w+)\s*;')),
+]
+
+# One classified source line: its kind, the regex match and its index in lines
+Node = namedtuple("Node", ["kind", "match", "line_idx"])
+
+def classifyLine(line, i):
+    for kind, pattern in LINE_KINDS:
+        match = pattern.search(line)
+        if match:
+            return Node(kind, match, i)
+    return None
 
-outputFile = open("/mnt/c/code/CS 240/240FinalProject/Compiler/program8.mpsm", "w")
+f = open("/mnt/c/code/CS 240/240FinalProject/Compiler/program8.c", "r")
+
+lines = f.readlines()
+
+ctx = CodegenContext()
+
+# Build the node list in a single pass over the source, then emit each block
+# from the (much smaller) sublist of nodes it needs, in source order
+nodes = [node for i, line in enumerate(lines) if (node := classifyLine(line, i))]
+data_nodes = [n for n in nodes if n.kind in ("print", "string") and "%d" not in n.match.string]
+instr_nodes = [n for n in nodes if n.kind in ("decl", "assign")]
+print_nodes = [n for n in nodes if n.kind == "print"]
+control_nodes = [n for n in nodes if n.kind in ("for", "if", "else")]
+
+out_lines = ["data: "]
+for node in data_nodes:
+    out_lines.extend(ctx.handleString(node.match))
+
+out_lines.append("instructions: ")
+for node in instr_nodes:
+    if node.kind == "decl":
+        out_lines.extend(ctx.handleDecl(node.match))
+    # assignments
+    else:
+        out_lines.extend(ctx.handleAssign(node.match))
+for node in print_nodes:
+    if "%d" in node.match.string:
+        break
+
+    out_lines.extend(ctx.handlePrint(node.match))
+for node in control_nodes:
+    if node.kind == "for":
+        out_lines.extend(ctx.handleFor(node.match))
+    elif node.kind == "if":
+        out_lines.extend(ctx.handleIf(lines, node.line_idx))
+    else:
+        out_lines.extend(ctx.handleElse(lines, node.line_idx))
+out_lines.append("    End:")
+out_lines.append("        end")
 
-outputFile.write(outputText)
+with open("/mnt/c/code/CS 240/240FinalProject/Compiler/program8.mpsm", "w") as outputFile:
+    outputFile.writelines(f"{line}\n" for line in out_lines)
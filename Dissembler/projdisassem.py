@@ -1,11 +1,15 @@
 import sys
 import os
+from array import array
+from typing import Callable, Optional, Union
+
+# Build a compiled version with `mypyc projdisassem.py`
 
 # --- Configuration for SimplyMiply Assembly Language ---
 
 # Reverse mapping: Opcode (binary string) -> Mnemonic (string)
 # Updated based on the assembler logic and fixes
-opcodes_to_mnemonics = {
+opcodes_to_mnemonics: dict[str, str] = {
     "000000": "clr",
     "000001": "cmb",
     "000010": "mns",
@@ -31,225 +35,275 @@ opcodes_to_mnemonics = {
     "111111": "end" # Assuming all 1s is end based on assembler output
 }
 
-# Reverse mapping: Register code (binary string) -> Name (string)
-registers_to_names = {format(i, '05b'): f"%r{i}" for i in range(32)}
+# Register number -> Name (string); all 32 values of a 5-bit field are covered
+REG_NAMES: list[str] = [f"%r{i}" for i in range(32)]
 # Add special names if needed, e.g.:
-# registers_to_names["00000"] = "%zero" # Or keep as %r0
+# REG_NAMES[0] = "%zero" # Or keep as %r0
 
 # --- Helper Functions ---
 
-def bin_to_int(bin_str):
-    """Converts a binary string to an integer."""
-    if not bin_str:
-        return 0
-    return int(bin_str, 2)
-
-def bin_to_signed_int(bin_str):
-    """Converts a two's complement binary string to a signed integer."""
-    if not bin_str:
-        return 0
-    value = int(bin_str, 2)
-    bits = len(bin_str)
-    if (value & (1 << (bits - 1))) != 0: # Check if sign bit is set
-        value = value - (1 << bits)      # Compute negative value
+def to_signed(value: int, bits: int) -> int:
+    """Interprets the low 'bits' bits of value as a two's complement integer."""
+    if value & (1 << (bits - 1)): # Check if sign bit is set
+        return value - (1 << bits) # Compute negative value
     return value
 
-def get_register_name(reg_bin):
-    """Looks up register name, returns binary string if not found."""
-    return registers_to_names.get(reg_bin, f"INVALID({reg_bin})")
+def words_from_bits(bits: Union[str, bytes], count: int) -> "array[int]":
+    """Splits a string/bytes of count*32 '0'/'1' characters into an array of 32-bit words."""
+    words: array[int] = array('I')
+    if count:
+        # One int() over all the bits, then split it into 4-byte words
+        words.frombytes(int(bits, 2).to_bytes(4 * count, "big"))
+        if sys.byteorder == "little":
+            words.byteswap()
+    return words
+
+def parse_words(binary_lines: list[str]) -> "array[int]":
+    """Parses a list of 32-character strings of only '0'/'1' into an array of 32-bit words."""
+    return words_from_bits("".join(binary_lines), len(binary_lines))
+
+# Header of packed files written by `SMA.py --binary` (PACKED_MAGIC there); the
+# header byte 0x7f can never start a 0/1 text file
+PACKED_MAGIC = b"\x7fSMW"
+
+def parse_packed_file(raw: bytes) -> "array[int]":
+    """Reads the words of a packed file: PACKED_MAGIC followed by 4-byte big-endian words."""
+    body = raw[len(PACKED_MAGIC):]
+    if len(body) % 4:
+        raise ValueError(f"Packed file has {len(body)} bytes of instructions, not a multiple of 4")
+    words: array[int] = array('I')
+    words.frombytes(body)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+def parse_uniform_file(raw: bytes) -> Optional[tuple[bytes, "array[int]"]]:
+    """
+    Fast path for the usual file shape: every line is exactly 32 '0'/'1' characters.
+    Checks the layout with whole-buffer byte operations and returns the bits and the
+    array of words, or None if the file has any other shape.
+    """
+    raw = raw.replace(b"\r", b"")
+    if not raw.endswith(b"\n"):
+        raw += b"\n" # Last line may lack its newline
+    count, rest = divmod(len(raw), 33)
+    if rest or raw[32::33].count(b"\n") != count:
+        return None
+    bits = raw.replace(b"\n", b"")
+    if len(bits) != 32 * count or bits.translate(None, b"01"):
+        return None
+    return bits, words_from_bits(bits, count)
+
+# --- Per-format decoders ---
+# Each decoder takes the instruction's %-template (mnemonic already filled in, see
+# DECODERS) and the 32-bit instruction word, and returns the assembly text.
+Decoder = Callable[[str, int], str]
+
+# R-type style: cmb, mns, mlt, dvd, mdlo (Op rs rt rd Unused)
+# Format: Op(6) rs(5) rt(5) rd(5) Unused(11)
+def decode_r_type(template: str, word: int) -> str:
+    # Fields go straight into the tuple: rs, rt, rd
+    return template % (REG_NAMES[(word >> 21) & 0x1F], REG_NAMES[(word >> 16) & 0x1F], REG_NAMES[(word >> 11) & 0x1F])
+
+# Immediate Arith: cmbi, mnsi, mlti, dvdi (Op rs Imm rd)
+# Format: Op(6) rs(5) Imm(15) rd(5) Unused(1)
+def decode_imm_type(template: str, word: int) -> str:
+    # rs, Imm, rd; assuming unsigned immediate for arith
+    return template % (REG_NAMES[(word >> 21) & 0x1F], (word >> 6) & 0x7FFF, REG_NAMES[(word >> 1) & 0x1F])
+
+# Load/Store Word: ldwd offset(%rs), rt / srwd rt, offset(%rs)
+# Format: Op(6) rs(5) rt(5) offset(16)
+# Both share this body; their templates name the fields, since the operand order differs
+def decode_mem(template: str, word: int) -> str:
+    return template % {
+        "rs": REG_NAMES[(word >> 21) & 0x1F], # Base register
+        "rt": REG_NAMES[(word >> 16) & 0x1F], # Loaded / stored register
+        "offset": to_signed(word & 0xFFFF, 16), # Offsets should be signed
+    }
+
+# Jump: jmp Label (or address)
+# Format: Op(6) Address(26)
+def decode_jmp(template: str, word: int) -> str:
+    target_address = word & 0x3FFFFFF
+    # Basic: Output numeric address. Advanced: map address to generated label (e.g., L14)
+    return template % target_address # Simple version for now
+
+# Print Int: pint %rs
+# Format: Op(6) rs(5) Unused(21)
+def decode_pint(template: str, word: int) -> str:
+    rs_name = REG_NAMES[(word >> 21) & 0x1F]
+    return template % rs_name
+
+# For loop: for %rs, Label (or address)
+# Format: Op(6) rs(5) Address(21)
+def decode_for(template: str, word: int) -> str:
+    rs_name = REG_NAMES[(word >> 21) & 0x1F]
+    target_address = word & 0x1FFFFF
+    # Basic: Output numeric address. Advanced: map address to generated label
+    return template % (rs_name, target_address)
+
+# Sqrt / Square: sqrt/sqr %rs, %rd
+# Format: Op(6) rs(5) rd(5) Unused(16)
+def decode_two_reg(template: str, word: int) -> str:
+    # rs, rd (rd sits in the rt slot)
+    return template % (REG_NAMES[(word >> 21) & 0x1F], REG_NAMES[(word >> 16) & 0x1F])
+
+# If Equal/Not Equal: ife/ifne %rs, %rt, Label (or address)
+# Format: Op(6) rs(5) rt(5) Address(16)
+def decode_branch(template: str, word: int) -> str:
+    # rs, rt, target address. Assuming absolute address based on assembler label handling.
+    # Basic: Output numeric address. Advanced: map address to generated label
+    return template % (REG_NAMES[(word >> 21) & 0x1F], REG_NAMES[(word >> 16) & 0x1F], word & 0xFFFF)
+
+# Load Address: ldad var(address), %rd
+# Format: Op(6) Address(21) rd(5)
+def decode_ldad(template: str, word: int) -> str:
+    rd_name = REG_NAMES[word & 0x1F]
+    address_val = (word >> 5) & 0x1FFFFF # Address is likely unsigned
+    # Disassembler doesn't know the original variable name, just the address
+    return template % (address_val, rd_name)
+
+# Print String / Load Immediate: pstr offset(%rs) / ldim imm, %rd
+# Format: Op(6) Value(21) Reg(5); the value is signed for both
+def decode_signed21_reg(template: str, word: int) -> str:
+    reg_name = REG_NAMES[word & 0x1F]
+    value = to_signed((word >> 5) & 0x1FFFFF, 21)
+    return template % (value, reg_name)
+
+# clr and end are whole-word instructions: only the all-zeros / all-ones word is valid
+def decode_clr(template: str, word: int) -> str:
+    return template if word == 0 else not_implemented(template, word)
+
+def decode_end(template: str, word: int) -> str:
+    return template if word == 0xFFFFFFFF else not_implemented(template, word)
+
+def not_implemented(template: str, word: int) -> str:
+    # clr/end opcodes with stray operand bits
+    return f"; Error: Disassembly logic not implemented for opcode {word >> 26:06b} ({template})"
+
+# Per-format decoder and operand template
+R_TYPE = (decode_r_type, "%s, %s, %s")
+IMM_TYPE = (decode_imm_type, "%s, %d, %s")
+TWO_REG = (decode_two_reg, "%s, %s")
+BRANCH = (decode_branch, "%s, %s, %d")
+
+# Mnemonic -> (decoder, operand template)
+decoders_by_mnemonic: dict[str, tuple[Decoder, str]] = {
+    "clr": (decode_clr, ""),
+    "end": (decode_end, ""),
+    "cmb": R_TYPE, "mns": R_TYPE, "mlt": R_TYPE, "dvd": R_TYPE, "mdlo": R_TYPE,
+    "cmbi": IMM_TYPE, "mnsi": IMM_TYPE, "mlti": IMM_TYPE, "dvdi": IMM_TYPE,
+    "ldwd": (decode_mem, "%(offset)d(%(rs)s), %(rt)s"),
+    "srwd": (decode_mem, "%(rt)s, %(offset)d(%(rs)s)"), # Note order matches assembly syntax
+    "jmp": (decode_jmp, "%d"),
+    "pint": (decode_pint, "%s"),
+    "pstr": (decode_signed21_reg, "%d(%s)"),
+    "for": (decode_for, "%s, %d"),
+    "sqrt": TWO_REG, "sqr": TWO_REG,
+    "ife": BRANCH, "ifne": BRANCH,
+    "ldad": (decode_ldad, "%d, %s"),
+    "ldim": (decode_signed21_reg, "%d, %s"),
+}
+
+# Dispatch table indexed by the 6-bit opcode: (decoder, template), or None for
+# unknown opcodes. Templates are built once here, e.g. "cmb %s, %s, %s".
+DECODERS: list[Optional[tuple[Decoder, str]]] = [None] * 64
+for _opcode_bin, _mnemonic in opcodes_to_mnemonics.items():
+    _decoder, _operands = decoders_by_mnemonic[_mnemonic]
+    DECODERS[int(_opcode_bin, 2)] = (_decoder, f"{_mnemonic} {_operands}" if _operands else _mnemonic)
 
 # --- Disassembler Core Logic ---
 
-def disassemble_instruction(binary_string, address):
+def disassemble_instruction(word: int, address: int) -> str:
     """
-    Disassembles a single 32-bit binary instruction string.
+    Disassembles a single 32-bit instruction word (an int).
     'address' is the line number/address of this instruction, potentially useful
     for label generation in the future.
     """
-    if len(binary_string) != 32:
-        return f"; Error: Invalid instruction length ({len(binary_string)} bits) at address {address}: {binary_string}"
-
-    opcode_bin = binary_string[0:6]
-
-    # Handle special full-width opcodes first
-    if binary_string == "11111111111111111111111111111111":
-        return "end"
-    # clr might be all zeros except opcode - check this specifically
-    if binary_string == "00000000000000000000000000000000":
-         # Verify opcode just in case
-         if opcode_bin == "000000":
-              return "clr"
-         else:
-              # Fall through if it's not the 'clr' opcode but still all zeros
-              pass
-
-    if opcode_bin not in opcodes_to_mnemonics:
-        return f"; Error: Unknown opcode {opcode_bin} at address {address}: {binary_string}"
-
-    mnemonic = opcodes_to_mnemonics[opcode_bin]
-
-    # --- Decode based on mnemonic/opcode ---
-
-    # R-type style: cmb, mns, mlt, dvd, mdlo (Op rs rt rd Unused)
-    # Format: Op(6) rs(5) rt(5) rd(5) Unused(11)
-    if mnemonic in ["cmb", "mns", "mlt", "dvd", "mdlo"]:
-        rs_bin = binary_string[6:11]
-        rt_bin = binary_string[11:16]
-        rd_bin = binary_string[16:21]
-        rs_name = get_register_name(rs_bin)
-        rt_name = get_register_name(rt_bin)
-        rd_name = get_register_name(rd_bin)
-        return f"{mnemonic} {rs_name}, {rt_name}, {rd_name}"
-
-    # Immediate Arith: cmbi, mnsi, mlti, dvdi (Op rs Imm rd)
-    # Format: Op(6) rs(5) Imm(15) rd(5)
-    elif mnemonic in ["cmbi", "mnsi", "mlti", "dvdi"]:
-        rs_bin = binary_string[6:11]
-        imm_bin = binary_string[11:26] # 15 bits
-        rd_bin = binary_string[26:31] # Next 5 bits (total 31) - Hmm, check assembler output format
-        # Let's re-check assembler code for these:
-        # return opcode_bin + rs + imm + rd -> 6 + 5 + 15 + 5 = 31 bits. Needs fix in assembler!
-        # Assuming assembler was fixed to make rd 5 bits and something else padded:
-        # Let's assume format is Op(6) rs(5) rd(5) Imm(16) like MIPS? -> 6+5+5+16 = 32 NO
-        # Let's assume format is Op(6) rs(5) Imm(15) rd(5) Unused(1) -> 6+5+15+5+1 = 32 YES - let's try this
-        rd_bin = binary_string[26:31]
-        # If format IS Op(6) rs(5) imm(15) rd(5), the last bit (31) is unused?
-        rs_name = get_register_name(rs_bin)
-        rd_name = get_register_name(rd_bin)
-        imm_val = bin_to_int(imm_bin) # Assuming unsigned immediate for arith
-        return f"{mnemonic} {rs_name}, {imm_val}, {rd_name}"
-        # !!! If the assembler *wasn't* fixed for these immediate types, this disassembler part is wrong !!!
-        # !!! Based on output bin, cmbi isn't used, let's ignore this potential issue for now. !!!
-
-
-    # Load Word: ldwd offset(%rs), rt
-    # Format: Op(6) rs(5) rt(5) offset(16) (Based on corrected assembler)
-    elif mnemonic == "ldwd":
-        rs_bin = binary_string[6:11]
-        rt_bin = binary_string[11:16]
-        offset_bin = binary_string[16:32]
-        rs_name = get_register_name(rs_bin)
-        rt_name = get_register_name(rt_bin)
-        offset_val = bin_to_signed_int(offset_bin) # Offsets should be signed
-        return f"{mnemonic} {offset_val}({rs_name}), {rt_name}"
-
-    # Store Word: srwd rt, offset(%rs)
-    # Format: Op(6) rs(5) rt(5) offset(16) (Based on corrected assembler)
-    elif mnemonic == "srwd":
-        rs_bin = binary_string[6:11]  # Base register
-        rt_bin = binary_string[11:16] # Source register to store
-        offset_bin = binary_string[16:32]
-        rs_name = get_register_name(rs_bin)
-        rt_name = get_register_name(rt_bin)
-        offset_val = bin_to_signed_int(offset_bin) # Offsets should be signed
-        return f"{mnemonic} {rt_name}, {offset_val}({rs_name})" # Note order matches assembly syntax
-
-    # Jump: jmp Label (or address)
-    # Format: Op(6) Address(26)
-    elif mnemonic == "jmp":
-        address_bin = binary_string[6:32]
-        target_address = bin_to_int(address_bin)
-        # Basic: Output numeric address. Advanced: map address to generated label (e.g., L14)
-        return f"{mnemonic} {target_address}" # Simple version for now
-
-    # Print Int: pint %rs
-    # Format: Op(6) rs(5) Unused(21)
-    elif mnemonic == "pint":
-        rs_bin = binary_string[6:11]
-        rs_name = get_register_name(rs_bin)
-        return f"{mnemonic} {rs_name}"
-
-    # Print String: pstr offset(%rs)
-    # Format: Op(6) Offset(21) rs(5)
-    elif mnemonic == "pstr":
-        offset_bin = binary_string[6:27] # 21 bits
-        rs_bin = binary_string[27:32]    # 5 bits
-        rs_name = get_register_name(rs_bin)
-        offset_val = bin_to_signed_int(offset_bin) # Offset could potentially be signed
-        return f"{mnemonic} {offset_val}({rs_name})"
-
-    # For loop: for %rs, Label (or address)
-    # Format: Op(6) rs(5) Address(21)
-    elif mnemonic == "for":
-        rs_bin = binary_string[6:11]
-        address_bin = binary_string[11:32] # 21 bits
-        rs_name = get_register_name(rs_bin)
-        target_address = bin_to_int(address_bin)
-        # Basic: Output numeric address. Advanced: map address to generated label
-        return f"{mnemonic} {rs_name}, {target_address}"
-
-    # Sqrt / Square: sqrt/sqr %rs, %rd
-    # Format: Op(6) rs(5) rd(5) Unused(16)
-    elif mnemonic in ["sqrt", "sqr"]:
-        rs_bin = binary_string[6:11]
-        rd_bin = binary_string[11:16] # Next 5 bits
-        rs_name = get_register_name(rs_bin)
-        rd_name = get_register_name(rd_bin)
-        return f"{mnemonic} {rs_name}, {rd_name}"
-
-    # If Equal/Not Equal: ife/ifne %rs, %rt, Label (or address)
-    # Format: Op(6) rs(5) rt(5) Address(16)
-    elif mnemonic in ["ife", "ifne"]:
-        rs_bin = binary_string[6:11]
-        rt_bin = binary_string[11:16]
-        address_bin = binary_string[16:32] # 16 bits
-        rs_name = get_register_name(rs_bin)
-        rt_name = get_register_name(rt_bin)
-        # Branch addresses are often relative PC+offset+1 or absolute.
-        # Assuming absolute address based on assembler label handling.
-        target_address = bin_to_int(address_bin)
-        # Basic: Output numeric address. Advanced: map address to generated label
-        return f"{mnemonic} {rs_name}, {rt_name}, {target_address}"
-
-    # Load Address: ldad var(address), %rd
-    # Format: Op(6) Address(21) rd(5)
-    elif mnemonic == "ldad":
-        address_bin = binary_string[6:27] # 21 bits
-        rd_bin = binary_string[27:32]     # 5 bits
-        rd_name = get_register_name(rd_bin)
-        address_val = bin_to_int(address_bin) # Address is likely unsigned
-        # Disassembler doesn't know the original variable name, just the address
-        return f"{mnemonic} {address_val}, {rd_name}"
-
-    # Load Immediate: ldim imm, %rd
-    # Format: Op(6) Imm(21) rd(5)
-    elif mnemonic == "ldim":
-        imm_bin = binary_string[6:27] # 21 bits
-        rd_bin = binary_string[27:32] # 5 bits
-        rd_name = get_register_name(rd_bin)
-        imm_val = bin_to_signed_int(imm_bin) # Immediate could be signed
-        return f"{mnemonic} {imm_val}, {rd_name}"
-
-    # --- Fallback/Error ---
-    else:
-        # Should not be reached if opcode is known, but good practice
-        return f"; Error: Disassembly logic not implemented for opcode {opcode_bin} ({mnemonic})"
-
-
-def run_disassembler(input_filename, output_filename):
-    """Reads binary file, disassembles instructions, writes assembly file."""
+    entry = DECODERS[word >> 26]
+    if entry is None:
+        return f"; Error: Unknown opcode {word >> 26:06b} at address {address}: {word:032b}"
+    decoder, template = entry
+    return decoder(template, word)
+
+
+# Lines joined per write() call; bounds the size of each joined string on huge inputs
+WRITE_CHUNK_LINES = 100_000
+
+def decode_cached(cache: dict[int, str], word: int, address: int) -> str:
+    """disassemble_instruction memoized on the word; repeated words skip decoding."""
+    text = cache.get(word)
+    if text is None:
+        text = disassemble_instruction(word, address)
+        if not text.startswith(";"):
+            cache[word] = text
+    return text
+
+
+def run_disassembler(input_filename: str, output_filename: str, verbose: bool = False) -> None:
+    """Reads binary file, disassembles instructions, writes assembly file.
+    The input is either 0/1 text lines or a packed file from `SMA.py --binary`.
+    Pass verbose=True to print every line as it is disassembled."""
     print(f"Disassembling {input_filename} to {output_filename}...")
-    disassembled_lines = []
+    disassembled_lines: list[str] = []
+    # Decoded text per distinct word; scoped to this file. The address only appears in
+    # error text, so error results (starting with ';') are not cached.
+    cache: dict[int, str] = {}
     try:
-        with open(input_filename, "r") as infile:
-            # Read all lines at once
-            binary_lines = infile.readlines()
-
-            # --- Main Disassembly Pass ---
-            print("Starting Disassembly Pass...")
+        with open(input_filename, "rb") as infile:
+            raw = infile.read()
+
+        # --- Main Disassembly Pass ---
+        print("Starting Disassembly Pass...")
+        packed = raw.startswith(PACKED_MAGIC)
+        uniform = None if packed else parse_uniform_file(raw)
+        if packed:
+            # Packed 4-byte words: no text parsing at all
+            words = parse_packed_file(raw)
+            if verbose:
+                for address, word in enumerate(words):
+                    print(f"  Disassembling word {address}: {word:032b}")
+            disassembled_lines = [decode_cached(cache, word, address) for address, word in enumerate(words)]
+        elif uniform is not None:
+            # Every line is a valid instruction: no per-line strip/length checks needed
+            bits, words = uniform
+            if verbose:
+                for address in range(len(words)):
+                    print(f"  Disassembling line {address}: {bits[32 * address:32 * address + 32].decode()}")
+            disassembled_lines = [decode_cached(cache, word, address) for address, word in enumerate(words)]
+        else:
+            binary_lines = raw.decode().splitlines()
+            # One preallocated slot per input line, indexed by address; blank lines leave None
+            slots: list[Optional[str]] = [None] * len(binary_lines)
+            word_lines: list[str] = []
+            word_addresses: list[int] = []
             for address, binary_line in enumerate(binary_lines):
-                binary_line = binary_line.strip() # Remove newline characters
+                binary_line = binary_line.strip() # Remove surrounding whitespace
                 if not binary_line:
                     continue # Skip empty lines
 
-                print(f"  Disassembling line {address}: {binary_line}")
+                if verbose:
+                    print(f"  Disassembling line {address}: {binary_line}")
                 if len(binary_line) != 32:
-                     print(f"Warning: Skipping line {address} due to invalid length ({len(binary_line)} bits). Content: '{binary_line}'")
-                     disassembled_lines.append(f"; Error: Invalid length at address {address}")
+                     if verbose:
+                         print(f"Warning: Skipping line {address} due to invalid length ({len(binary_line)} bits). Content: '{binary_line}'")
+                     slots[address] = f"; Error: Invalid length at address {address}"
                      continue
+                if binary_line.strip("01"):
+                     # int(..., 2) would also take '_' or a sign, so check for plain bits here
+                     if verbose:
+                         print(f"Warning: Skipping line {address} due to non-binary characters. Content: '{binary_line}'")
+                     slots[address] = f"; Error: Invalid characters at address {address}: {binary_line}"
+                     continue
+
+                word_lines.append(binary_line)
+                word_addresses.append(address)
 
-                assembly_instruction = disassemble_instruction(binary_line, address)
-                disassembled_lines.append(assembly_instruction)
+            # Parse all instructions in one batch, then decode the batch
+            words = parse_words(word_lines)
+            for address, word in zip(word_addresses, words):
+                slots[address] = decode_cached(cache, word, address)
+            disassembled_lines = [line for line in slots if line is not None]
 
     except FileNotFoundError:
         print(f"Error: Input file '{input_filename}' not found.")
@@ -262,8 +316,10 @@ def run_disassembler(input_filename, output_filename):
     try:
         with open(output_filename, "w") as outfile:
             print(f"Writing {len(disassembled_lines)} lines to {output_filename}...")
-            for asm_line in disassembled_lines:
-                outfile.write(asm_line + "\n")
+            # Join and write in large chunks instead of one write per line
+            for start in range(0, len(disassembled_lines), WRITE_CHUNK_LINES):
+                outfile.write("\n".join(disassembled_lines[start:start + WRITE_CHUNK_LINES]))
+                outfile.write("\n")
         print("Disassembly complete.")
     except IOError as e:
         print(f"Error writing output file '{output_filename}': {e}")
@@ -272,6 +328,9 @@ def run_disassembler(input_filename, output_filename):
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    # --verbose prints every line as it is disassembled
+    verbose = "--verbose" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--verbose"]
     # Basic argument handling like the MIPS example
     # if len(sys.argv) != 3:
     #     print("Usage: python disassembler.py <input_binary_file> <output_assembly_file>")
@@ -284,10 +343,10 @@ if __name__ == "__main__":
     #          print(f"Warning: Default input file '{input_file}' not found. Disassembler might produce empty output.")
     #          # Optional: exit if default input is required
     #           # sys.exit(1)
-    if len(sys.argv) == 3:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
+    if len(args) == 2:
+        input_file = args[0]
+        output_file = args[1]
     else:
         input_file = '/mnt/c/code/CS 240/240FinalProject/Dissembler/program2.bin'
         output_file = '/mnt/c/code/CS 240/240FinalProject/Dissembler/program2.mpsm'
-    run_disassembler(input_file, output_file)
\ No newline at end of file
+    run_disassembler(input_file, output_file, verbose=verbose)
\ No newline at end of file
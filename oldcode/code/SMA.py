@@ -1,57 +1,81 @@
 import sys
 import os
-import re # For parsing memory addresses like offset(%register)
+import logging
+import re # For matching label definitions
+from typing import Any, Callable, Optional
+from array import array # Packed 32-bit words for bulk output formatting
+from functools import lru_cache
+
+# Compiles as-is with `mypyc SMA.py`
 
 # --- Configuration for SimplyMiply Assembly Language ---
 
 # Map instruction mnemonics to their 6-bit opcode
-opcodes = {
-    "clr":    "000000",
-    "cmb":    "000001",  # Add the opcode for the 'cmb' instruction
-    "mns":    "000010",
-    "mlt":    "000011",
-    "dvd":    "000100",
-    "cmbi":   "000101",
-    "ldwd":   "000110",
-    "srwd":   "000111",
-    "jmp":    "001000",
-    "pint":   "001001",
-    "pstr":   "001010",
-    "mnsi":   "001011",
-    "mlti":   "001100",
-    "dvdi":   "001101",
-    "for":    "001110",
-    "sqrt":   "001111",
-    "mdlo":   "010000",
-    "sqr":    "010001",
-    "ife":    "010010",
-    "ifne":   "010011",
-    "ldad":   "010100",
-    "ldim":   "010101",
-    "end":    "111111" # Special case, but good to have here
+opcodes: dict[str, int] = {
+    "clr":    0b000000,
+    "cmb":    0b000001,  # Add the opcode for the 'cmb' instruction
+    "mns":    0b000010,
+    "mlt":    0b000011,
+    "dvd":    0b000100,
+    "cmbi":   0b000101,
+    "ldwd":   0b000110,
+    "srwd":   0b000111,
+    "jmp":    0b001000,
+    "pint":   0b001001,
+    "pstr":   0b001010,
+    "mnsi":   0b001011,
+    "mlti":   0b001100,
+    "dvdi":   0b001101,
+    "for":    0b001110,
+    "sqrt":   0b001111,
+    "mdlo":   0b010000,
+    "sqr":    0b010001,
+    "ife":    0b010010,
+    "ifne":   0b010011,
+    "ldad":   0b010100,
+    "ldim":   0b010101,
+    "end":    0b111111 # Special case, but good to have here
 }
 
-# Define register names and their 5-bit binary representation
+# Define register names and their 5-bit register number
 # Assuming 32 registers like MIPS (%r0 to %r31)
-registers = {f"%r{i}": format(i, '05b') for i in range(32)}
+registers: dict[str, int] = {f"%r{i}": i for i in range(32)}
 # Add a special case for %zero maybe, if needed? Assuming %r0 is the zero register.
-# registers["%zero"] = "00000" # Uncomment if you use %zero explicitly
+# registers["%zero"] = 0 # Uncomment if you use %zero explicitly
 
-# --- Helper Functions ---
+# Per-line trace output goes through logging so it costs nothing unless enabled,
+# e.g. with logging.basicConfig(level=logging.DEBUG)
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Compiled once here rather than on every line
+_LABEL_RE = re.compile(r"^([a-zA-Z_][a-zA-Z0-9_]*):$")
 
-def parse_register(reg_str):
-    """Converts register string like '%r5' to its 5-bit binary representation."""
+# --- Helper Functions ---
+# The underscore-prefixed default arguments below (_regs=registers, _int=int, ...)
+# bind module globals and builtins as fast locals; these functions run once or
+# more per instruction. Callers never pass them.
+# parse_immediate is pure, and programs reuse the same few constants over and
+# over, so its results are memoized.
+
+def parse_register(reg_str: str) -> int:
+    """Converts register string like '%r5' to its register number.
+
+    The encoders index registers directly; encode_instruction calls this only
+    after a failed lookup, to turn the bad name into a ValueError.
+    """
     reg_str = reg_str.replace(',', '') # Remove trailing comma if present
     if reg_str in registers:
         return registers[reg_str]
     else:
         raise ValueError(f"Invalid register name: {reg_str}")
 
-def parse_immediate(imm_str, bits):
-    """Converts an immediate value string to its binary representation, padded to 'bits' length."""
+@lru_cache(maxsize=1024)
+def parse_immediate(imm_str: str, bits: int, _int: Callable[[str], int] = int) -> int:
+    """Converts an immediate value string to an integer field 'bits' wide (two's complement if negative)."""
     imm_str = imm_str.replace(',', '') # Remove trailing comma
     try:
-        value = int(imm_str)
+        value = _int(imm_str)
         # Basic range check (assuming unsigned or two's complement fits)
         min_val = -(2**(bits-1)) if bits > 0 else 0 # Rough lower bound for signed
         max_val = (2**bits) - 1 if bits > 0 else 0 # Upper bound for unsigned
@@ -61,266 +85,344 @@ def parse_immediate(imm_str, bits):
              # Handle two's complement if needed
              if value < min_val:
                  raise ValueError(f"Immediate value {value} too small for {bits} bits.")
-             # Convert negative to two's complement binary string of 'bits' length
-             return format(value & ((1 << bits) - 1), f'0{bits}b')
+             # Convert negative to its two's complement field of 'bits' length
+             return value & ((1 << bits) - 1)
 
         if value > max_val:
              raise ValueError(f"Immediate value {value} too large for {bits} bits.")
-        # Convert positive to binary string
-        return format(value, f'0{bits}b')
+        return value
 
     except ValueError as e:
         raise ValueError(f"Invalid immediate value: {imm_str}. {e}")
 
+def check_address(address: int, bits: int) -> int:
+    """Makes sure a label address fits in an address field of 'bits' length."""
+    if address >> bits:
+        raise ValueError(f"Address {address} too large for {bits} bits.")
+    return address
+
 
-def parse_memory_address(mem_str):
+def parse_memory_address(mem_str: str, _regs: dict[str, int] = registers, _int: Callable[[str], int] = int) -> tuple[int, str]:
     """Parses memory address string like 'offset(%reg)' into offset and register string."""
     mem_str = mem_str.replace(',', '') # Remove trailing comma
-    match = re.match(r"(-?\d+)\((%r\d+)\)", mem_str) # Allow negative offset
-    if match:
-        offset = int(match.group(1))
-        reg = match.group(2)
-        return offset, reg
-    else:
-        # Handle case like 'var' for ldad? No, ldad is handled separately.
-        # Handle case where offset might be zero and omitted? e.g., (%r0)
-        match_no_offset = re.match(r"\((%r\d+)\)", mem_str)
-        if match_no_offset:
-            return 0, match_no_offset.group(1)
-        raise ValueError(f"Invalid memory address format: {mem_str}")
-
-# --- Assembler Core Logic ---
-
-def assemble_line(line, label_table, current_address):
-    """Assembles a single line of assembly code into binary."""
-    parts = line.split(maxsplit=1) # Split only the mnemonic from the rest
-    op = parts[0].lower() # Use lower case for consistency
+    # Offset is optional, e.g. (%r0) means 0(%r0); negative offsets are allowed
+    offset_str, paren, rest = mem_str.partition('(')
+    reg = rest[:-1]
+    # Accept only an optional '-' and digits (the old -?\d+ pattern);
+    # int() alone would also take '_', '+' and surrounding spaces
+    digits = offset_str[1:] if offset_str.startswith('-') else offset_str
+    if paren and rest.endswith(')') and reg in _regs and (not offset_str or digits.isdigit()):
+        try:
+            return (_int(offset_str) if offset_str else 0), reg
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid memory address format: {mem_str}")
+
+# --- Instruction Format Handlers ---
+# Each handler takes (op, operands, operands_str, opcode, label_table) and
+# returns the 32-bit instruction word as an int. Register operands are looked
+# up directly in the registers table; an unknown name raises KeyError, which
+# encode_instruction turns into the usual ValueError.
+#
+# Apart from clr and end, handlers are not written by hand: FORMATS describes
+# the operand syntax and bit layout of each instruction format, and
+# make_encoder generates one straight-line function per opcode from it with
+# the opcode bits, shifts and widths already filled in as constants.
+#
+# Field specs, in operand order:
+#   ("reg",   i, shift)                       register operand i
+#   ("imm",   i, shift, bits)                 immediate operand i
+#   ("label", i, shift, bits)                 label operand i, resolved through label_table
+#   ("mem",   i, shift, bits, reg_shift)      offset(%reg) operand i: offset field + base register field
+
+def _clr(op: str, operands: list[str], operands_str: str, opcode: int, label_table: dict[str, int]) -> int:
+    return 0 # Opcode + 26 zeros
+
+def _end(op: str, operands: list[str], operands_str: str, opcode: int, label_table: dict[str, int]) -> int:
+    return 0xFFFFFFFF # Special end instruction, all ones
+
+# Format name -> (expected operand syntax for error messages, field specs)
+FORMATS: dict[str, tuple[str, tuple[tuple[Any, ...], ...]]] = {
+    # R-type style: cmb, mns, mlt, dvd, mdlo (op rs rt rd unused)
+    # Format: op(6) rs(5) rt(5) rd(5) unused(11)
+    "r_type":  ("3 register operands",
+                (("reg", 0, 21), ("reg", 1, 16), ("reg", 2, 11))),
+    # Immediate Arith: cmbi, mnsi, mlti, dvdi (op rs imm rd)
+    # Format: op(6) rs(5) imm(15) rd(5) unused(1) -> same layout the disassembler decodes
+    "imm_type": ("register, immediate, register",
+                (("reg", 0, 21), ("imm", 1, 6, 15), ("reg", 2, 1))),
+    # Load Word: ldwd offset(%rs), rt
+    # Format: op(6) rs(5) rt(5) offset(16)
+    "ldwd":    ("'offset(%rs), rt'",
+                (("mem", 0, 0, 16, 21), ("reg", 1, 16))),
+    # Store Word: srwd rt, offset(%rs)
+    # Format: op(6) rs(5) rt(5) offset(16), same as ldwd
+    # Example: 000111 00000 00001 0000000000000000 - %r1, 0(%r0) => rs=%r0 rt=%r1 offset=0
+    "srwd":    ("'rt, offset(%rs)'",
+                (("reg", 0, 16), ("mem", 1, 0, 16, 21))),
+    # Jump: jmp Label (op address)
+    # Format: op(6) address(26)
+    "jmp":     ("1 label operand",
+                (("label", 0, 0, 26),)),
+    # Print Int: pint %rs (op rs unused)
+    # Format: op(6) rs(5) unused(21)
+    "pint":    ("1 register operand",
+                (("reg", 0, 21),)),
+    # Print String: pstr offset(%rs) (op offset rs)
+    # Format: op(6) offset(21) rs(5)
+    "pstr":    ("'offset(%rs)'",
+                (("mem", 0, 5, 21, 0),)),
+    # For loop: for %rs, Label (op rs address)
+    # Format: op(6) rs(5) address(21)
+    "for":     ("register, label",
+                (("reg", 0, 21), ("label", 1, 0, 21))),
+    # Sqrt / Square: sqrt/sqr %rs, %rd (op rs rd unused)
+    # Format: op(6) rs(5) rd(5) unused(16)
+    "two_reg": ("2 register operands",
+                (("reg", 0, 21), ("reg", 1, 16))),
+    # If Equal/Not Equal: ife/ifne %rs, %rt, Label (op rs rt address)
+    # Format: op(6) rs(5) rt(5) address(16)
+    "branch":  ("2 registers and a label",
+                (("reg", 0, 21), ("reg", 1, 16), ("label", 2, 0, 16))),
+    # Load Address: ldad var, %rd (op address rd)
+    # Format: op(6) address(21) rd(5)
+    # 'var' is resolved like a jump target, so it must be a known label for this assembler.
+    "ldad":    ("label/var, register",
+                (("label", 0, 5, 21), ("reg", 1, 0))),
+    # Load Immediate: ldim imm, %rd (op imm rd)
+    # Format: op(6) imm(21) rd(5)
+    "ldim":    ("immediate, register",
+                (("imm", 0, 5, 21), ("reg", 1, 0))),
+}
 
-    if not op:
-        return None # Skip empty lines
+# Mnemonic -> instruction format
+OPCODE_FORMATS: dict[str, str] = {
+    "cmb":  "r_type",
+    "mns":  "r_type",
+    "mlt":  "r_type",
+    "dvd":  "r_type",
+    "mdlo": "r_type",
+    "cmbi": "imm_type",
+    "mnsi": "imm_type",
+    "mlti": "imm_type",
+    "dvdi": "imm_type",
+    "ldwd": "ldwd",
+    "srwd": "srwd",
+    "jmp":  "jmp",
+    "pint": "pint",
+    "pstr": "pstr",
+    "for":  "for",
+    "sqrt": "two_reg",
+    "sqr":  "two_reg",
+    "ife":  "branch",
+    "ifne": "branch",
+    "ldad": "ldad",
+    "ldim": "ldim",
+}
 
-    if op == "clr":
-        return "000000" + "0" * 26 # Opcode + 26 zeros
+def make_encoder(op: str, fmt: str) -> Callable[[str, list[str], str, int, dict[str, int]], int]:
+    """Generates the encoder for one opcode from its entry in FORMATS."""
+    syntax, fields = FORMATS[fmt]
+    src = [
+        f"def _encode_{op}(op, operands, operands_str, opcode, label_table):",
+        f"    if len(operands) != {len(fields)}:",
+        f"        raise ValueError(f\"Instruction '{{op}}' requires {syntax}. Got: {{operands_str}}\")",
+        f"    word = {opcodes[op] << 26}",
+    ]
+    for kind, i, shift, *rest in fields:
+        if kind == "reg":
+            src.append(f"    word |= _regs[operands[{i}]] << {shift}")
+        elif kind == "imm":
+            src.append(f"    word |= parse_immediate(operands[{i}], {rest[0]}) << {shift}")
+        elif kind == "label":
+            # Label references are validated once after Pass 1 (see run_assembler)
+            src.append(f"    word |= check_address(label_table[operands[{i}]], {rest[0]}) << {shift}")
+        elif kind == "mem":
+            bits, reg_shift = rest
+            src += [
+                f"    offset_val, rs_str = parse_memory_address(operands[{i}])",
+                f"    word |= parse_immediate(str(offset_val), {bits}) << {shift}",
+                f"    word |= _regs[rs_str] << {reg_shift}",
+            ]
+        else:
+            raise ValueError(f"Unknown field kind '{kind}' in format '{fmt}'")
+    src.append("    return word")
+
+    namespace: dict[str, Any] = {
+        "_regs": registers,
+        "parse_immediate": parse_immediate,
+        "parse_memory_address": parse_memory_address,
+        "check_address": check_address,
+    }
+    exec("\n".join(src), namespace)
+    encoder: Callable[[str, list[str], str, int, dict[str, int]], int] = namespace[f"_encode_{op}"]
+    return encoder
+
+# Mnemonic -> (operand count, index of the label operand) for instructions that take a label
+_LABEL_OPERANDS: dict[str, tuple[int, int]] = {
+    op: (len(FORMATS[fmt][1]), field[1])
+    for op, fmt in OPCODE_FORMATS.items()
+    for field in FORMATS[fmt][1]
+    if field[0] == "label"
+}
 
-    if op == "end":
-        return "1" * 32 # Special end instruction
+def referenced_label(op: str, operands: list[str]) -> Optional[str]:
+    """Returns the label an instruction refers to, or None if it has no (well-formed) label operand."""
+    spec = _LABEL_OPERANDS.get(op)
+    if spec is None or len(operands) != spec[0]:
+        return None # Wrong operand counts are reported by the encoder
+    return operands[spec[1]]
+
+def undefined_label_message(op: str, label: str) -> str:
+    if op == "ldad":
+        return f"Undefined label/variable for ldad: {label}"
+    return f"Undefined label: {label}"
+
+# Map each mnemonic to the handler for its instruction format
+_HANDLERS: dict[str, Callable[[str, list[str], str, int, dict[str, int]], int]] = {
+    "clr":  _clr,
+    "end":  _end,
+}
+_HANDLERS.update({op: make_encoder(op, fmt) for op, fmt in OPCODE_FORMATS.items()})
+
+# Written at the start of --binary output so the disassembler can tell a packed
+# file from 0/1 text; keep in sync with PACKED_MAGIC in Dissembler/projdisassem.py
+PACKED_MAGIC = b"\x7fSMW"
+
+def pack_words(words: list[int]) -> "array[int]":
+    """Packs 32-bit instruction words into an array holding them big-endian in memory."""
+    packed = array('I', words) # 'I' is a 4-byte unsigned int on all supported platforms
+    if sys.byteorder == 'little':
+        packed.byteswap()
+    return packed
+
+def format_words(words: list[int]) -> list[str]:
+    """Formats a list of 32-bit instruction words as 32-character binary strings.
+
+    All words are packed big-endian into one integer and formatted with a
+    single format() call, then sliced back into lines, instead of formatting
+    every word separately.
+    """
+    if not words:
+        return []
+    bits = format(int.from_bytes(pack_words(words).tobytes(), 'big'), f'0{32 * len(words)}b')
+    return [bits[i:i + 32] for i in range(0, len(bits), 32)]
 
-    if op not in opcodes:
-        raise ValueError(f"Unknown instruction: {op}")
+# --- Assembler Core Logic ---
 
-    opcode_bin = opcodes[op]
+def tokenize_line(line: str) -> tuple[str, list[str], str]:
+    """Splits an instruction line into its mnemonic, operand list and raw operand text."""
+    parts = line.split(maxsplit=1) # Split only the mnemonic from the rest
+    op = parts[0].lower() # Use lower case for consistency
     operands_str = parts[1] if len(parts) > 1 else ""
     operands = [p.strip() for p in operands_str.split(',')] # Split remaining operands by comma
+    return op, operands, operands_str
 
+def encode_instruction(op: str, operands: list[str], operands_str: str, label_table: dict[str, int],
+                       _ops: dict[str, int] = opcodes,
+                       _handlers: dict[str, Callable[[str, list[str], str, int, dict[str, int]], int]] = _HANDLERS) -> int:
+    """Encodes an already tokenized instruction into its 32-bit instruction word."""
+    if op not in _ops:
+        raise ValueError(f"Unknown instruction: {op}")
 
-    # --- Instruction Format Handling ---
-
-    # R-type style: cmb, mns, mlt, dvd, mdlo (op rs rt rd unused)
-    if op in ["cmb", "mns", "mlt", "dvd", "mdlo"]:
-        if len(operands) != 3:
-            raise ValueError(f"Instruction '{op}' requires 3 register operands. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        rt = parse_register(operands[1])
-        rd = parse_register(operands[2])
-        unused = "0" * 11
-        return opcode_bin + rs + rt + rd + unused
-
-    # Immediate Arith: cmbi, mnsi, mlti, dvdi (op rs imm rd)
-    elif op in ["cmbi", "mnsi", "mlti", "dvdi"]:
-        if len(operands) != 3:
-            raise ValueError(f"Instruction '{op}' requires register, immediate, register. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        imm = parse_immediate(operands[1], 15) # 15 bits for immediate
-        rd = parse_register(operands[2])
-        return opcode_bin + rs + imm + rd
-
-    # Load Word: ldwd offset(%rs), rt (op imm rs rt) -> Matches example binary breakdown
-    # Example: 000110 000000000000000 00000 00001 => op | offset(17) | rs(5) | rt(5)  <-- REVISED based on example binary
-    elif op == "ldwd":
-         if len(operands) != 2:
-            raise ValueError(f"Instruction '{op}' requires 'offset(%rs), rt'. Got: {operands_str}")
-         offset_val, rs_str = parse_memory_address(operands[0])
-         rt = parse_register(operands[1])
-         rs = parse_register(rs_str)
-         offset_bin = parse_immediate(str(offset_val), 16) # 17 bits for offset
-         return opcode_bin + rs + rt + offset_bin # Rearranged to match example binary 000110 offset(17) rs(5) rt(5)
-
-    # Store Word: srwd rt, offset(%rs) (op imm rs rt) -> Matches example binary breakdown
-    # Example: 000111 00000 000000000000000 00001 => op | rt(5) | offset(17) | rs(5) <-- REVISED based on example binary
-    elif op == "srwd":
-        if len(operands) != 2:
-           raise ValueError(f"Instruction '{op}' requires 'rt, offset(%rs)'. Got: {operands_str}")
-        rt = parse_register(operands[0])
-        offset_val, rs_str = parse_memory_address(operands[1])
-        rs = parse_register(rs_str)
-        offset_bin = parse_immediate(str(offset_val), 16) # 17 bits for offset
-        # Note: The example binary 000111 00000 000000000000000 00001 suggests: op | rs | offset | rt
-        # Let's stick to the example binary layout: op(6) rs(5) offset(17) rt(5)
-        # Example: 000111 00000 000000000000000 00001 - %r0, 0(%r1) => op=%srwd rs=%r0 offset=0 rt=%r1
-        return opcode_bin + rs + rt + offset_bin # Matches example binary structure 000111 rt(5) offset(17) rs(5)
-
-
-    # Jump: jmp Label (op address)
-    elif op == "jmp":
-        if len(operands) != 1:
-            raise ValueError(f"Instruction '{op}' requires 1 label operand. Got: {operands_str}")
-        label = operands[0]
-        if label not in label_table:
-            raise ValueError(f"Undefined label: {label}")
-        address = label_table[label]
-        address_bin = format(address, f'0{26}b') # 26 bits for address/offset
-        return opcode_bin + address_bin
-
-    # Print Int: pint %rs (op rs unused)
-    elif op == "pint":
-        if len(operands) != 1:
-            raise ValueError(f"Instruction '{op}' requires 1 register operand. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        unused = "0" * 21
-        return opcode_bin + rs + unused
-
-    # Print String: pstr offset(%rs) (op offset rs) -> Matches example binary
-    # Example: 001010 00000000000000000000 00000 => op | offset(21) | rs(5)
-    elif op == "pstr":
-        if len(operands) != 1:
-           raise ValueError(f"Instruction '{op}' requires 'offset(%rs)'. Got: {operands_str}")
-        offset_val, rs_str = parse_memory_address(operands[0])
-        rs = parse_register(rs_str)
-        offset_bin = parse_immediate(str(offset_val), 21) # 21 bits for offset
-        return opcode_bin + offset_bin + rs
-
-    # For loop: for %rs, Label (op rs address)
-    elif op == "for":
-        if len(operands) != 2:
-           raise ValueError(f"Instruction '{op}' requires register, label. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        label = operands[1]
-        if label not in label_table:
-           raise ValueError(f"Undefined label: {label}")
-        address = label_table[label]
-        address_bin = format(address, f'0{21}b') # 21 bits for address/offset
-        return opcode_bin + rs + address_bin
-
-    # Sqrt: sqrt %rs, %rd (op rs rd unused)
-    elif op == "sqrt":
-        if len(operands) != 2:
-            raise ValueError(f"Instruction '{op}' requires 2 register operands. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        rd = parse_register(operands[1])
-        unused = "0" * 16
-        return opcode_bin + rs + rd + unused
-
-    # Square: sqr %rs, %rd (op rs rd unused)
-    elif op == "sqr":
-        if len(operands) != 2:
-            raise ValueError(f"Instruction '{op}' requires 2 register operands. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        rd = parse_register(operands[1])
-        unused = "0" * 16
-        return opcode_bin + rs + rd + unused
-
-    # If Equal/Not Equal: ife/ifne %rs, %rt, Label (op rs rt address)
-    elif op in ["ife", "ifne"]:
-        if len(operands) != 3:
-            raise ValueError(f"Instruction '{op}' requires 2 registers and a label. Got: {operands_str}")
-        rs = parse_register(operands[0])
-        rt = parse_register(operands[1])
-        label = operands[2]
-        if label not in label_table:
-            raise ValueError(f"Undefined label: {label}")
-        address = label_table[label]
-        address_bin = format(address, f'0{16}b') # Only 16 bits left based on example: 6+5+5 = 16. 32-16 = 16.
-                                                 # Let's re-check example: 010010 00000 00001 000000000000000
-                                                 # Op(6) rs(5) rt(5) addr(16) - Yes, 16 bits.
-        return opcode_bin + rs + rt + address_bin
-
-    # Load Address: ldad var, %rd (op address rd) -> Matches example
-    # Example: 010100 00000000000000000000 00000 => op | address(21) | rd(5)
-    elif op == "ldad":
-        if len(operands) != 2:
-           raise ValueError(f"Instruction '{op}' requires label/var, register. Got: {operands_str}")
-        label = operands[0] # Should be a label defined elsewhere (e.g., in a .data section conceptually)
-        rd = parse_register(operands[1])
-        # How is 'var' resolved? Assuming it's a label like jump targets.
-        if label not in label_table:
-            # This might indicate a variable in a data segment, not a code label.
-            # For now, we treat it like a code label. Needs clarification on how 'var' addresses are determined.
-            # Let's assume it must be a known label for this assembler.
-            raise ValueError(f"Undefined label/variable for ldad: {label}")
-        address = label_table[label]
-        address_bin = format(address, f'0{21}b') # 21 bits for address
-        return opcode_bin + address_bin + rd
-
-    # Load Immediate: ldim imm, %rd (op imm rd) -> Matches example
-    # Example: 010101 00000000000000000000 00000 => op | imm(21) | rd(5)
-    elif op == "ldim":
-        if len(operands) != 2:
-           raise ValueError(f"Instruction '{op}' requires immediate, register. Got: {operands_str}")
-        imm = parse_immediate(operands[0], 21) # 21 bits for immediate
-        rd = parse_register(operands[1])
-        return opcode_bin + imm + rd
-
-    # --- Fallback/Error ---
-    else:
-        # This case should ideally not be reached if all opcodes are handled above
+    handler = _handlers.get(op)
+    if handler is None:
+        # Every opcode should have a handler registered in _HANDLERS
         raise NotImplementedError(f"Assembly rule for instruction '{op}' not implemented.")
 
-def run_assembler(input_filename, output_filename):
-    """Runs the two-pass assembler."""
-    print(f"Assembling {input_filename} to {output_filename}...")
-    label_table = {}
-    cleaned_lines = []
+    try:
+        return handler(op, operands, operands_str, _ops[op], label_table)
+    except KeyError as e:
+        # run_assembler checks labels before Pass 2, but assemble_line callers may not have
+        label = referenced_label(op, operands)
+        if label is not None and label not in label_table:
+            raise ValueError(undefined_label_message(op, label)) from None
+        # Otherwise it was a register lookup; parse_register reports the bad name
+        parse_register(e.args[0])
+        raise
+
+def assemble_line(line: str, label_table: dict[str, int], current_address: int) -> int:
+    """Assembles a single line of assembly code into its 32-bit instruction word."""
+    op, operands, operands_str = tokenize_line(line)
+    return encode_instruction(op, operands, operands_str, label_table)
+
+def run_assembler(input_filename: str, output_filename: str, quiet: bool = False, binary: bool = False) -> None:
+    """Runs the two-pass assembler. Pass quiet=True to suppress the status messages.
+
+    By default the output is text, one 32-character line of 0s and 1s per
+    instruction. With binary=True the file starts with PACKED_MAGIC and each
+    instruction is written as 4 raw big-endian bytes, which makes it 8x smaller.
+    """
+    if not quiet:
+        print(f"Assembling {input_filename} to {output_filename}...")
+    label_table: dict[str, int] = {}
+    # Instructions tokenized in Pass 1: (op, operands, operands_str, addr, orig_line)
+    cleaned_lines: list[tuple[str, list[str], str, int, int]] = []
+    # Label references seen in Pass 1: (label, op, orig_line)
+    referenced: list[tuple[str, str, int]] = []
     current_address = 0
 
     # --- Pass 1: Build Label Table & Clean Lines ---
-    print("Starting Pass 1...")
+    if not quiet:
+        print("Starting Pass 1...")
     try:
         with open(input_filename, "r") as infile:
-            for line_num, line in enumerate(infile, 1):
-                original_line_content = line.strip() # Get raw line content for comparison
-                print(f"\nDEBUG: === Processing Line {line_num} ===")
-                print(f"DEBUG: Original content: '{original_line_content}'")
-
-                # 1. Remove comments
-                line_no_comment = line.split('#')[0]
-                print(f"DEBUG: After comment split: '{line_no_comment}'")
-                line_stripped = line_no_comment.strip()
-                print(f"DEBUG: After strip(): '{line_stripped}' (Length: {len(line_stripped)})")
-
-                # Check if the line is now effectively empty
-                if not line_stripped:
-                    print("DEBUG: Line is empty after cleaning, skipping.")
-                    continue # Skip to the next line
-
-                # 2. Check for label definitions
-                label_match = re.match(r"^([a-zA-Z_][a-zA-Z0-9_]*):$", line_stripped)
-                instruction_part = line_stripped # Assume it's an instruction unless it's only a label
-
-                if label_match:
-                    label = label_match.group(1)
-                    if label in label_table:
-                        raise ValueError(f"Duplicate label '{label}' found at line {line_num}")
-                    print(f"DEBUG: Found label '{label}' at address {current_address}")
-                    label_table[label] = current_address
-                    instruction_part = "" # Line only contained a label
-                    print(f"DEBUG: Instruction part set to '' because it was a label.")
-                # No else needed here, instruction_part remains line_stripped if no label match
-
-                # 3. Prepare line for Pass 2 if it contains an instruction
-                # We already have instruction_part from above
-                print(f"DEBUG: Checking instruction part for Pass 2: '{instruction_part}' (Length: {len(instruction_part)})")
-
-                if instruction_part: # Check if the string is non-empty
-                    print(f"DEBUG: *** ADDING instruction to cleaned_lines (Address: {current_address}) ***")
-                    cleaned_lines.append({'line': instruction_part, 'addr': current_address, 'orig_line': line_num})
-                    current_address += 1
-                else:
-                     # Only print skip message if it wasn't just a blank/comment line initially
-                    if original_line_content and not label_match:
-                         print("DEBUG: Skipping line (instruction part is empty, not a label).")
-                    elif label_match:
-                         print("DEBUG: Skipping line (was a label definition).")
-                    # No message needed if it started as a blank/comment line
+            source_lines = infile.read().splitlines() # Read and split the whole file once
+        for line_num, line in enumerate(source_lines, 1):
+            original_line_content = line.strip() # Get raw line content for comparison
+            log.debug("=== Processing Line %d ===", line_num)
+            log.debug("Original content: '%s'", original_line_content)
+
+            # 1. Remove comments
+            line_no_comment = line.split('#')[0]
+            log.debug("After comment split: '%s'", line_no_comment)
+            line_stripped = line_no_comment.strip()
+            log.debug("After strip(): '%s' (Length: %d)", line_stripped, len(line_stripped))
+
+            # Check if the line is now effectively empty
+            if not line_stripped:
+                log.debug("Line is empty after cleaning, skipping.")
+                continue # Skip to the next line
+
+            # 2. Check for label definitions
+            label_match = _LABEL_RE.match(line_stripped)
+            instruction_part = line_stripped # Assume it's an instruction unless it's only a label
+
+            if label_match:
+                label = label_match.group(1)
+                if label in label_table:
+                    raise ValueError(f"Duplicate label '{label}' found at line {line_num}")
+                log.debug("Found label '%s' at address %d", label, current_address)
+                label_table[label] = current_address
+                instruction_part = "" # Line only contained a label
+                log.debug("Instruction part set to '' because it was a label.")
+            # No else needed here, instruction_part remains line_stripped if no label match
+
+            # 3. Prepare line for Pass 2 if it contains an instruction
+            # We already have instruction_part from above
+            log.debug("Checking instruction part for Pass 2: '%s' (Length: %d)", instruction_part, len(instruction_part))
+
+            if instruction_part: # Check if the string is non-empty
+                log.debug("*** ADDING instruction to cleaned_lines (Address: %d) ***", current_address)
+                op, operands, operands_str = tokenize_line(instruction_part)
+                cleaned_lines.append((op, operands, operands_str, current_address, line_num))
+                label_ref = referenced_label(op, operands)
+                if label_ref is not None:
+                    referenced.append((label_ref, op, line_num))
+                current_address += 1
+            else:
+                 # Only print skip message if it wasn't just a blank/comment line initially
+                if original_line_content and not label_match:
+                     log.debug("Skipping line (instruction part is empty, not a label).")
+                elif label_match:
+                     log.debug("Skipping line (was a label definition).")
+                # No message needed if it started as a blank/comment line
+
+        # Check every label reference once here, so the encoders can index label_table directly
+        missing = {label for label, _, _ in referenced} - label_table.keys()
+        if missing:
+            label, op, ref_line = next(ref for ref in referenced if ref[0] in missing)
+            raise ValueError(f"{undefined_label_message(op, label)} (referenced at line {ref_line})")
 
     except FileNotFoundError:
         print(f"Error: Input file '{input_filename}' not found.")
@@ -329,33 +431,30 @@ def run_assembler(input_filename, output_filename):
         print(f"Error during Pass 1: {e}")
         sys.exit(1)
 
-    print("\nPass 1 complete. Label Table:")
-    print(label_table)
-    print("DEBUG: Final cleaned_lines list:") # Added label for clarity
-    print(cleaned_lines) # Print the list that Pass 2 will use
+    if not quiet:
+        print("\nPass 1 complete. Label Table:")
+        print(label_table)
+    log.debug("Final cleaned_lines list: %s", cleaned_lines) # The list that Pass 2 will use
 
     # --- Pass 2: Assemble Instructions ---
-    print("Starting Pass 2...")
-    assembled_code = []
+    if not quiet:
+        print("Starting Pass 2...")
+    assembled_code: list[int] = []
     # Need to add a variable to track line number for error reporting in pass 2
     current_processed_line_num = 0
     try:
         # Check if cleaned_lines is empty before proceeding
         if not cleaned_lines:
-            print("DEBUG: cleaned_lines is empty. No instructions to assemble in Pass 2.")
+            log.debug("cleaned_lines is empty. No instructions to assemble in Pass 2.")
 
-        for item in cleaned_lines:
-            line = item['line']
-            addr = item['addr']
-            orig_line_num = item['orig_line']
+        # Lines were already split into mnemonic and operands in Pass 1; this is encoding only
+        for op, operands, operands_str, addr, orig_line_num in cleaned_lines:
             current_processed_line_num = orig_line_num # Store for potential error message
-            print(f"  Assembling line {orig_line_num} (Addr {addr}): {line}")
-            binary_code = assemble_line(line, label_table, addr)
-            if binary_code:
-                if len(binary_code) != 32:
-                     raise ValueError(f"Internal Error: Assembled code for '{line}' is not 32 bits long! ({len(binary_code)} bits)")
-                assembled_code.append(binary_code)
-            # Removed the 'else' warning here, as assemble_line should either return code or raise error
+            log.debug("Assembling line %d (Addr %d): %s %s", orig_line_num, addr, op, operands_str)
+            word = encode_instruction(op, operands, operands_str, label_table)
+            if word >> 32:
+                 raise ValueError(f"Internal Error: Assembled code for '{op} {operands_str}' does not fit in 32 bits! ({word.bit_length()} bits)")
+            assembled_code.append(word)
 
     except (ValueError, NotImplementedError) as e:
         # Use the stored line number for better error context
@@ -364,16 +463,21 @@ def run_assembler(input_filename, output_filename):
         sys.exit(1)
 
     # --- Write Output ---
-    print(f"DEBUG: Number of binary instructions generated: {len(assembled_code)}")
+    log.debug("Number of binary instructions generated: %d", len(assembled_code))
     try:
-        with open(output_filename, "w") as outfile:
+        with open(output_filename, "wb" if binary else "w") as outfile:
+            if binary:
+                 outfile.write(PACKED_MAGIC)
             # Check if there's anything to write
             if not assembled_code:
-                 print("DEBUG: No assembled code to write to output file.")
-            for binary_line in assembled_code:
-                outfile.write(binary_line + "\n")
+                 log.debug("No assembled code to write to output file.")
+            elif binary:
+                 pack_words(assembled_code).tofile(outfile)
+            else:
+                 outfile.writelines(binary_line + "\n" for binary_line in format_words(assembled_code))
         # Confirmation message comes after the writing block
-        print(f"Assembly complete. Output written to {output_filename}")
+        if not quiet:
+            print(f"Assembly complete. Output written to {output_filename}")
 
     except IOError as e:
         print(f"Error writing output file '{output_filename}': {e}")
@@ -381,8 +485,11 @@ def run_assembler(input_filename, output_filename):
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python assembler.py <input_assembly_file> <output_binary_file>")
+    # --binary writes packed 4-byte words instead of 0/1 text lines
+    binary_output = "--binary" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--binary"]
+    if len(args) != 2:
+        print("Usage: python assembler.py [--binary] <input_assembly_file> <output_binary_file>")
         # Provide default filenames for easier testing if none are given
         print("Running with default filenames: program.asm -> program.bin")
         input_file = "program.asm"  # Name of the input assembly file
@@ -417,7 +524,7 @@ end_program:
     end               # End program
 """)
     else:
-        input_file = sys.argv[1]
-        output_file = sys.argv[2]
+        input_file = args[0]
+        output_file = args[1]
 
-    run_assembler(input_file, output_file)
\ No newline at end of file
+    run_assembler(input_file, output_file, binary=binary_output)
\ No newline at end of file
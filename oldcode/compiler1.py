@@ -1,90 +1,95 @@
-memoryAddress = 5000
-tRegister = 0
-vars = dict()
+import re
+from dataclasses import dataclass, field
 
-def getInstructionLine(varName):
-    global memoryAddress, tRegister
-    tRegisterName = f"$t{tRegister}"
-    setVariableRegister(varName, tRegisterName)
-    returnText = f"addi {tRegisterName}, $zero, {memoryAddress}"
-    tRegister += 1
-    memoryAddress += 4
-    return returnText
+@dataclass(slots=True)
+class CodegenContext:
+    """Code generation state: next free memory address, next free $t register and the variable table."""
+    memoryAddress: int = 5000
+    tRegister: int = 0
+    vars: dict = field(default_factory=dict)
 
-def setVariableRegister(varName, tRegister):
-    global vars
-    vars[varName] = tRegister
+    def getInstructionLine(self, varName):
+        tRegisterName = f"$t{self.tRegister}"
+        self.setVariableRegister(varName, tRegisterName)
+        returnText = f"addi {tRegisterName}, $zero, {self.memoryAddress}"
+        self.tRegister += 1
+        self.memoryAddress += 4
+        return returnText
 
-def getVariableRegister(varName):
-    global vars
-    if varName in vars:
-        return vars[varName]
-    else:
-        return "ERROR"
+    def setVariableRegister(self, varName, tRegister):
+        self.vars[varName] = tRegister
 
-def getAssignmentLinesImmediateValue(val, varName):
-    global tRegister
-    outputText = f"""addi $t{tRegister}, $zero, {val}
-sw $t{tRegister}, 0({getVariableRegister(varName)})"""
-    tRegister += 1
-    return outputText
+    def getVariableRegister(self, varName):
+        return self.vars.get(varName, "ERROR")
 
+    def getAssignmentLinesImmediateValue(self, val, varName):
+        tRegister = self.tRegister
+        outputText = f"""addi $t{tRegister}, $zero, {val}
+sw $t{tRegister}, 0({self.getVariableRegister(varName)})"""
+        self.tRegister += 1
+        return outputText
 
-def getAssignmentLinesVariable(varSource, varDest):
-    global tRegister
-    outputText = ""
-    registerSource = getVariableRegister(varSource)
-    outputText += f"    lw $t{tRegister}, 0({registerSource})" + "\n"
+    def getAssignmentLinesVariable(self, varSource, varDest):
+        tRegister = self.tRegister
+        registerSource = self.getVariableRegister(varSource)
+        self.tRegister += 1
+        registerDest = self.getVariableRegister(varDest)
+        return f"    lw $t{tRegister}, 0({registerSource})\nsw $t{tRegister}, 0({registerDest})"
 
-    tRegister += 1
+# One compiled pattern classifies a line. Each alternative is wrapped in its own
+# outer named group, so m.lastgroup names the statement kind that matched.
+LINE_RE = re.compile(r"""
+    (?P<if>if\ (?P<cond>.*))                                # if (<cond>){
+  | (?P<close>\})                                           # closing brace
+  | (?P<decl>int\ \s*(?P<name>\S+)\s*$)                     # int <name>;
+  | (?P<assign>\s*(?P<dest>\S+)\s+=\s+(?P<src>\S+)\s*$)     # <dest> = <src>;
+""", re.S | re.X)
+# String literals are collected independently of the statement kind
+STRING_RE = re.compile(r'"([^"]*)"')
 
-    registerDest = getVariableRegister(varDest)
+def main(src, dst):
+    """Compiles the C source file src and writes the assembly to dst."""
+    with open(src, "r") as f:
+        lines = f.readlines()
 
-    outputText += f"sw $t{tRegister-1}, 0({registerDest})"
-    # tRegister += 1
-    return outputText
+    ctx = CodegenContext()
 
-f = open("program7.c", "r")
+    # Collect output chunks in a list and join once at the end
+    parts = []
 
-lines = f.readlines()
+    for line in lines:
+        parts.append("data:")
+        string_match = STRING_RE.search(line)
+        if string_match:
+            string = string_match.group(1)
+            name = string.strip("\n")
+            ctx.vars[name] = string
+            parts.append(f"{name}: {string}")
 
-outputText = ""
+        m = LINE_RE.match(line)
+        kind = m.lastgroup if m else None
+        if kind == "if":
+            expr = m.group("cond").replace("(","").replace(")","").replace("{","")
+            parts.append(expr)
+        elif kind == "close":
+            parts.append("AFTER:" + "\n")
+        # int declarations
+        elif kind == "decl":
+            var = m.group("name").strip(";")
+            parts.append(ctx.getInstructionLine(var) + "\n")
+        # assignments
+        elif kind == "assign":
+            varName = m.group("dest")
+            val = m.group("src").strip(";")
+            if val.isdigit():
+                # immediately value assignments
+                parts.append(ctx.getAssignmentLinesImmediateValue(val, varName) + "\n")
+            else:
+                # variable assignments
+                parts.append(ctx.getAssignmentLinesVariable(val, varName) + "\n")
 
-for line in lines:
-    outputText += "data:"
-    if "\"" in line:
-        _,string,_ = line.split("\"")
-        name = string.strip("\n")
-        vars[name] = string
-        outputText += f"{name}: {string}"
-    
-    
-    
-    
-    if line.startswith("if "):
-        _, expr = line.split("if ")
-        expr = expr.replace("(","").replace(")","").replace("{","")
-        outputText += expr
-    elif line.startswith("}"):
-        outputText += "AFTER:" + "\n"
-    # int declarations
-    elif line.startswith("int "):
-        _, var = line.split()
-        var = var.strip(";")
-        outputText += getInstructionLine(var) + "\n"
-    # assignments
-    elif "=" in line:
-        varName, _, val = line.split()
-        val = val.strip(";")
-        if val.isdigit():
-            # immediately value assignments
-            outputText += getAssignmentLinesImmediateValue(val, varName) + "\n"
-        else:
-            # variable assignments
-            outputText += getAssignmentLinesVariable(val, varName) + "\n"
-    else:
-        pass
+    with open(dst, "w") as outputFile:
+        outputFile.write("".join(parts))
 
-outputFile = open("output7.asm", "w")
-
-outputFile.write(outputText)
\ No newline at end of file
+if __name__ == "__main__":
+    main("program7.c", "output7.asm")